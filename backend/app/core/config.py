@@ -4,21 +4,25 @@ This module contains the configuration for the FastAPI app.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from loguru import logger
+from starlette.types import Lifespan
 
-from .connection_manager import ConnectionManager
 
-
-def create_app() -> FastAPI:
+def create_app(lifespan: Lifespan[FastAPI] | None = None) -> FastAPI:
     """
     Create a FastAPI app instance.
 
+    Args:
+        lifespan (Lifespan[FastAPI] | None): Startup and shutdown handler for the app.
+
     Returns:
         FastAPI: The FastAPI app instance.
     """
 
     logger.info("Creating FastAPI application")
-    app = FastAPI()
+    # Route results are serialized with orjson rather than the stdlib encoder
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
     # Enable CORS
     app.add_middleware(
@@ -29,8 +33,5 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    logger.info("Initializing connection manager")
-    app.state.connection_manager = ConnectionManager()
-
     logger.info("FastAPI application created successfully")
     return app
@@ -12,6 +12,8 @@ CAMPAIGN_IMAGES_DIR = "campaign_images"
 MONSTERS_DIR = "monsters"
 # Define the path to the sounds directory
 SOUNDS_DIR = Path(__file__).parent.parent.parent.parent / "backend" / "sounds"
+# Chunk size used when streaming uploaded files to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 # Ensure directories exist
 os.makedirs(MAPS_DIR, exist_ok=True)
@@ -37,6 +37,8 @@ from ..models.campaign_tavern import (
     TavernOptionDefinition,
     TavernOptionInstance,
 )
+from .maps import invalidate_maps_scan
+from .scenes import discard_image_log, invalidate_scene_manifest
 
 router = APIRouter()
 
@@ -78,6 +80,7 @@ class ProcessingContext:
     options: dict[str, bool]
     stats: ImportStats
     total_files: int
+    file_names: frozenset[str]
 
 
 @dataclass
@@ -145,6 +148,7 @@ def _process_zip_file(
         options=options,
         stats=stats,
         total_files=total_files,
+        file_names=frozenset(file_list),
     )
 
     for file_path in file_list:
@@ -182,7 +186,14 @@ def _process_single_file(context: ProcessingContext, file_path: str) -> None:
     )
 
     # Extract and copy the file
-    _extract_and_copy_file(extraction_context, file_path, parts)
+    dest_path = _extract_and_copy_file(extraction_context, file_path, parts)
+
+    # A restored scene replaces the local one, so images logged against the
+    # local scene must not be added to it, unless the backup has its own log
+    if content_type == "scenes" and file_path.endswith(".json"):
+        image_log = os.path.splitext(file_path)[0] + ".images.log"
+        if image_log not in context.file_names:
+            discard_image_log(dest_path)
 
     # Log progress
     if context.stats.extracted_files % 10 == 0:
@@ -194,8 +205,8 @@ def _process_single_file(context: ProcessingContext, file_path: str) -> None:
 
 def _extract_and_copy_file(
     context: ExtractionContext, file_path: str, parts: list[str]
-) -> None:
-    """Extract a file from zip and copy it to destination."""
+) -> str:
+    """Extract a file from zip, copy it to destination and return its new path."""
     # Extract the file
     extract_path = os.path.join(context.temp_dir, file_path)
     context.zip_file.extract(file_path, context.temp_dir)
@@ -215,6 +226,7 @@ def _extract_and_copy_file(
     # Copy the extracted file to the destination
     shutil.copy2(extract_path, dest_path)
     context.stats.extracted_files += 1
+    return dest_path
 
 
 def _save_uploaded_file(backup_file: UploadFile, temp_dir: str) -> tuple[str, int]:
@@ -1022,6 +1034,10 @@ async def import_backup(
             # Extract and process zip file
             with zipfile.ZipFile(zip_path, "r") as zip_file:
                 _process_zip_file(zip_file, temp_dir, options, stats)
+                if options.get("maps", False):
+                    invalidate_maps_scan()
+                if options.get("scenes", False):
+                    invalidate_scene_manifest()
 
                 # Handle special data types that need database operations
                 if options.get("users", False):
@@ -2,17 +2,21 @@
 This module contains the maps routes for the FastAPI app.
 """
 
+import asyncio
 import json
 import os
 import shutil
+from dataclasses import dataclass
 from typing import Any
 
+import orjson
 from fastapi import APIRouter, Body, File, Form, HTTPException, UploadFile
 from fastapi.responses import FileResponse
 from loguru import logger
 
-from ..core.constants import MAPS_DIR, SCENES_DIR
+from ..core.constants import MAPS_DIR, SCENES_DIR, UPLOAD_CHUNK_SIZE
 from ..models.map import FolderItem, MapData
+from .scenes import invalidate_scene_manifest
 
 router = APIRouter()
 
@@ -22,38 +26,113 @@ def ensure_folder_exists(folder_path: str) -> None:
     os.makedirs(folder_path, exist_ok=True)
 
 
-def get_folder_structure() -> list[FolderItem]:
-    """Scan the maps directory and return the folder structure."""
-    folders = []
+# File extensions that are listed as maps, in lower case; matching ignores case
+_MAP_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".svg"})
 
-    for root, _, _ in os.walk(MAPS_DIR):
-        rel_path = os.path.relpath(root, MAPS_DIR) if root != MAPS_DIR else ""
 
-        # Skip the root directory itself
-        if rel_path != "":
-            parent = os.path.dirname(rel_path) if os.path.dirname(rel_path) else None
-            folder_name = os.path.basename(rel_path)
+@dataclass
+class _MapsScan:
+    """Maps and folders found by one walk of the maps directory."""
 
-            folders.append(FolderItem(name=folder_name, path=rel_path, parent=parent))
+    maps: list[dict[str, Any]]
+    folders: list[FolderItem]
+    # The first map found with each file name
+    maps_by_name: dict[str, dict[str, Any]]
+    # Modification time of every directory walked. Adding, removing or renaming
+    # an entry changes its directory's mtime, which makes the scan stale. This is
+    # only a backstop for changes made outside the maps endpoints, which drop the
+    # scan themselves: coarse timestamps (e.g. FAT SD cards) can hide a change.
+    dir_mtimes: dict[str, int]
 
-    return folders
 
+@dataclass
+class _MapsScanState:
+    """
+    Last scan of MAPS_DIR, reused until the maps endpoints change the tree or a
+    directory in it changes.
+    """
 
-def get_maps_in_structure() -> list[dict[str, Any]]:
-    """Return all maps with their folder structure."""
-    maps = []
+    scan: _MapsScan | None = None
+
+
+_maps_scan_state = _MapsScanState()
+
+
+def invalidate_maps_scan() -> None:
+    """
+    Discard the scan of the maps directory so it is rebuilt on next use. Call
+    this after changing files in the maps directory.
+    """
+    _maps_scan_state.scan = None
+
+
+def _scan_maps_dir() -> _MapsScan:
+    """Walk the maps directory once, collecting both maps and folders."""
+    scan = _MapsScan(maps=[], folders=[], maps_by_name={}, dir_mtimes={})
+    _scan_maps_folder(scan, MAPS_DIR, "")
+    return scan
+
+
+def _scan_maps_folder(scan: _MapsScan, path: str, rel_path: str) -> None:
+    """Add a folder's maps to a scan, then recurse into its subfolders."""
+    try:
+        # Taken before listing, so a change made during the scan leaves it stale
+        scan.dir_mtimes[path] = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        # Unreadable folders are skipped, as os.walk does
+        return
 
-    for root, _, files in os.walk(MAPS_DIR):
-        for file in files:
-            if file.endswith(
-                (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".svg")
-            ):
-                rel_path = os.path.relpath(root, MAPS_DIR) if root != MAPS_DIR else ""
-                folder = rel_path if rel_path != "" else None
+    folder = rel_path if rel_path != "" else None
+    subfolders = []
+    for entry in entries:
+        if entry.is_dir():
+            # Symlinked folders are skipped, as os.walk does
+            if not entry.is_symlink():
+                subfolders.append(entry)
+            continue
+        _, dot, extension = entry.name.rpartition(".")
+        if dot and "." + extension.lower() in _MAP_EXTENSIONS:
+            map_data = {"name": entry.name, "folder": folder}
+            scan.maps.append(map_data)
+            scan.maps_by_name.setdefault(entry.name, map_data)
+
+    for entry in subfolders:
+        sub_path = os.path.join(rel_path, entry.name) if rel_path else entry.name
+        scan.folders.append(FolderItem(name=entry.name, path=sub_path, parent=folder))
+        _scan_maps_folder(scan, entry.path, sub_path)
+
+
+def _is_scan_current(scan: _MapsScan) -> bool:
+    """Check whether any directory in a scan has changed since it was taken."""
+    if not scan.dir_mtimes:
+        return False
+    try:
+        return all(
+            os.stat(path).st_mtime_ns == mtime
+            for path, mtime in scan.dir_mtimes.items()
+        )
+    except OSError:
+        return False
+
+
+def _get_maps_scan() -> _MapsScan:
+    """Return the scan of the maps directory, rescanning it if it has changed."""
+    scan = _maps_scan_state.scan
+    if scan is None or not _is_scan_current(scan):
+        scan = _maps_scan_state.scan = _scan_maps_dir()
+    return scan
+
+
+def get_folder_structure() -> list[FolderItem]:
+    """Scan the maps directory and return the folder structure."""
+    return _get_maps_scan().folders
 
-                maps.append({"name": file, "folder": folder})
 
-    return maps
+def get_maps_in_structure() -> list[dict[str, Any]]:
+    """Return all maps with their folder structure."""
+    return _get_maps_scan().maps
 
 
 @router.get("/list")
@@ -90,6 +169,8 @@ async def create_folder(folder_data: dict[str, str] = Body(...)) -> dict[str, st
         return {"message": f"Folder '{folder_name}' created successfully"}
     except OSError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+    finally:
+        invalidate_maps_scan()
 
 
 @router.delete("/folder/{folder_name}")
@@ -105,6 +186,8 @@ async def delete_folder(folder_name: str) -> dict[str, str]:
         return {"message": f"Folder '{folder_name}' deleted successfully"}
     except (OSError, shutil.Error) as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+    finally:
+        invalidate_maps_scan()
 
 
 @router.post("/upload")
@@ -127,8 +210,7 @@ async def upload_map(
         # Save the uploaded file
         file_path = os.path.join(target_dir, file.filename)
         with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+            await asyncio.to_thread(shutil.copyfileobj, file.file, f, UPLOAD_CHUNK_SIZE)
 
         return {
             "filename": file.filename,
@@ -136,6 +218,8 @@ async def upload_map(
         }
     except OSError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+    finally:
+        invalidate_maps_scan()
 
 
 @router.get("/file/{path:path}")
@@ -188,8 +272,7 @@ async def get_map(path: str) -> FileResponse:
 
 def find_map_in_structure(file_name: str) -> dict[str, Any]:
     """Find a map in the folder structure and return its data."""
-    maps = get_maps_in_structure()
-    map_data = next((m for m in maps if m["name"] == file_name), None)
+    map_data = _get_maps_scan().maps_by_name.get(file_name)
 
     if not map_data:
         logger.error(f"Map '{file_name}' not found in structure")
@@ -214,49 +297,105 @@ def get_map_paths(file_name: str, map_data: dict[str, Any]) -> tuple[str, str]:
     return folder_path, file_path
 
 
-def update_scenes_for_renamed_map(file_name: str, new_name: str) -> int:
-    """Update all scenes that reference the renamed map and return count of updated scenes."""
-    scenes_updated = 0
-    scenes_folder = os.path.join(os.getcwd(), SCENES_DIR)
+def _write_file_atomic(path: str, payload: bytes) -> None:
+    """
+    Write a file through a temporary file that is renamed over it, so it is
+    never left half written. The temporary file is removed if writing fails.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(file=tmp_path, mode="wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
 
-    logger.debug(f"Looking for scenes referencing map '{file_name}' in {scenes_folder}")
 
-    if not os.path.exists(scenes_folder):
-        return scenes_updated
+def _json_string_forms(value: str) -> frozenset[bytes]:
+    """Return the ways a string is encoded in JSON: raw UTF-8 or ASCII-escaped."""
+    return frozenset((orjson.dumps(value), json.dumps(value).encode()))
 
-    for scene_file in os.listdir(scenes_folder):
-        if not scene_file.endswith(".json"):
-            continue
 
-        scene_path = os.path.join(scenes_folder, scene_file)
-        try:
-            with open(file=scene_path, encoding="utf-8") as f:
-                scene_data = json.load(f)
+def update_scene_for_renamed_map(
+    scene_path: str, file_name: str, new_name: str, name_forms: frozenset[bytes]
+) -> bool:
+    """
+    Update map references in one scene file and return whether it changed.
+    name_forms are the JSON encodings of file_name, from _json_string_forms.
+    """
+    scene_file = os.path.basename(scene_path)
+    try:
+        with open(file=scene_path, mode="rb") as f:
+            content = f.read()
+
+        # A scene can only reference the map by its name as a JSON string, so a
+        # scene that doesn't contain that string is skipped without parsing it
+        if not any(form in content for form in name_forms):
+            return False
+
+        scene_data = orjson.loads(content)
+
+        map_refs_updated = False
+
+        # Update map references in the maps array
+        if "maps" in scene_data and isinstance(scene_data["maps"], list):
+            for i, map_ref in enumerate(scene_data["maps"]):
+                if isinstance(map_ref, dict) and map_ref.get("name") == file_name:
+                    scene_data["maps"][i]["name"] = new_name
+                    map_refs_updated = True
+
+        # Update the active map reference if it matches
+        if scene_data.get("activeMapId") == file_name:
+            scene_data["activeMapId"] = new_name
+            map_refs_updated = True
+
+        if not map_refs_updated:
+            return False
 
-            map_refs_updated = False
+        # Save the updated scene to a temporary file renamed over the original,
+        # so the scene is never left half written
+        _write_file_atomic(
+            scene_path, orjson.dumps(scene_data, option=orjson.OPT_INDENT_2)
+        )
+        logger.info(f"Updated map reference in scene: {scene_file}")
+        return True
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.error(f"Error updating scene {scene_file}: {str(e)}")
+        return False
 
-            # Update map references in the maps array
-            if "maps" in scene_data and isinstance(scene_data["maps"], list):
-                for i, map_ref in enumerate(scene_data["maps"]):
-                    if isinstance(map_ref, dict) and map_ref.get("name") == file_name:
-                        scene_data["maps"][i]["name"] = new_name
-                        map_refs_updated = True
 
-            # Update the active map reference if it matches
-            if scene_data.get("activeMapId") == file_name:
-                scene_data["activeMapId"] = new_name
-                map_refs_updated = True
+async def update_scenes_for_renamed_map(file_name: str, new_name: str) -> int:
+    """Update all scenes that reference the renamed map and return count of updated scenes."""
+    scenes_folder = os.path.join(os.getcwd(), SCENES_DIR)
 
-            # Save the updated scene if changes were made
-            if map_refs_updated:
-                with open(file=scene_path, mode="w", encoding="utf-8") as f:
-                    json.dump(scene_data, f, indent=2)
-                scenes_updated += 1
-                logger.info(f"Updated map reference in scene: {scene_file}")
-        except (OSError, json.JSONDecodeError) as e:
-            logger.error(f"Error updating scene {scene_file}: {str(e)}")
+    logger.debug(f"Looking for scenes referencing map '{file_name}' in {scenes_folder}")
 
-    return scenes_updated
+    if not os.path.exists(scenes_folder):
+        return 0
+
+    scene_paths = [
+        os.path.join(scenes_folder, scene_file)
+        for scene_file in os.listdir(scenes_folder)
+        if scene_file.endswith(".json")
+    ]
+
+    # Scene files are independent and mostly wait on disk, so they are read,
+    # parsed and rewritten in parallel on the default thread pool, which also
+    # bounds how many are open at once
+    name_forms = _json_string_forms(file_name)
+    updated = await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                update_scene_for_renamed_map, path, file_name, new_name, name_forms
+            )
+            for path in scene_paths
+        )
+    )
+    return sum(updated)
 
 
 def rename_map_file(old_path: str, new_path: str) -> None:
@@ -277,18 +416,32 @@ def update_map_data_file(old_data_path: str, new_data_path: str, new_name: str)
 
     logger.info(f"Renaming data file from {old_data_path} to {new_data_path}")
     try:
-        os.rename(old_data_path, new_data_path)
-
-        # Update the name inside the JSON file
+        # Update the name inside the JSON file, writing the result straight to
+        # the new path and only then removing the old file
+        written = False
         try:
-            with open(file=new_data_path, encoding="utf-8") as f:
-                data = json.load(f)
+            with open(file=old_data_path, mode="rb") as f:
+                data = orjson.loads(f.read())
             if isinstance(data, dict) and "name" in data:
                 data["name"] = new_name
-                with open(file=new_data_path, mode="w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2)
-        except (OSError, json.JSONDecodeError) as e:
+                _write_file_atomic(
+                    new_data_path, orjson.dumps(data, option=orjson.OPT_INDENT_2)
+                )
+                written = True
+        except (OSError, orjson.JSONDecodeError) as e:
             logger.error(f"Error updating JSON data file: {str(e)}")
+
+        if written:
+            # The new file is complete, so failing to remove the old one must
+            # not fall through to the rename below, which would overwrite it
+            try:
+                os.remove(old_data_path)
+            except OSError as e:
+                logger.error(f"Error removing old data file: {str(e)}")
+            return
+
+        # Nothing to update, or updating failed; the file still moves with the map
+        os.rename(old_data_path, new_data_path)
     except OSError as e:
         logger.error(f"Error renaming data file: {str(e)}")
 
@@ -319,7 +472,9 @@ async def rename_map(
             )
 
         # Update scenes that reference this map
-        scenes_updated = update_scenes_for_renamed_map(file_name, new_name)
+        scenes_updated = await update_scenes_for_renamed_map(file_name, new_name)
+        if scenes_updated:
+            invalidate_scene_manifest()
 
         # Rename the actual map file
         logger.info(f"Renaming file from {old_path} to {new_path}")
@@ -341,6 +496,8 @@ async def rename_map(
     except (OSError, json.JSONDecodeError) as e:
         logger.exception(f"OSError or JSONDecodeError in rename_map: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
+    finally:
+        invalidate_maps_scan()
 
 
 @router.put("/move/{file_name}")
@@ -351,8 +508,7 @@ async def move_map(
     target_folder = move_data.get("folder")
 
     # Find the map in the folder structure
-    maps = get_maps_in_structure()
-    map_data = next((m for m in maps if m["name"] == file_name), None)
+    map_data = _get_maps_scan().maps_by_name.get(file_name)
 
     if not map_data:
         raise HTTPException(status_code=404, detail=f"Map '{file_name}' not found")
@@ -377,6 +533,8 @@ async def move_map(
         return {"message": f"Map '{file_name}' moved successfully"}
     except (OSError, shutil.Error) as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+    finally:
+        invalidate_maps_scan()
 
 
 def delete_map_file(file_path: str) -> None:
@@ -426,6 +584,8 @@ async def delete_map(file_name: str) -> dict[str, str]:
     except OSError as e:
         logger.exception(f"OSError in delete_map: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
+    finally:
+        invalidate_maps_scan()
 
 
 @router.post("/data")
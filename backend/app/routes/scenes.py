@@ -2,21 +2,495 @@
 This module contains the scenes routes for the FastAPI app.
 """
 
-import json
+import asyncio
 import os
+import re
 import shutil
+import threading
 import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+import orjson
+from fastapi import APIRouter, File, HTTPException, Request, Response, UploadFile
 from fastapi.responses import FileResponse
 from loguru import logger
 
-from ..core.constants import SCENES_DIR
+from ..core.constants import SCENES_DIR, UPLOAD_CHUNK_SIZE
 from ..models.scenes import FolderCreateRequest, FolderRenameRequest, SceneData
 
 router = APIRouter()
 
+# Read scene files concurrently when listing. Disable on storage where parallel
+# reads are slower than sequential ones (e.g. SD cards on single-board hosts).
+PARALLEL_SCENE_READS = True
+
+# Parsed scene files, keyed by path and validated against the (mtime, size) of the
+# scene file and its image log so edits made outside this module are still picked
+# up. Least recently used is evicted.
+SCENE_CACHE_SIZE = 256
+_FileKey = tuple[int, int]
+_scene_cache: OrderedDict[
+    str, tuple[tuple[_FileKey, _FileKey | None], dict[str, Any]]
+] = OrderedDict()
+_scene_cache_lock = threading.Lock()
+
+# An image log larger than this is folded into its scene file when the scene is
+# loaded, so scenes whose images change but that are never saved in full don't
+# accumulate an ever-growing log.
+IMAGE_LOG_COMPACT_SIZE = 64 * 1024
+# Held by everything that rewrites, moves or deletes a scene file or its image
+# log, so compaction can't write a stale scene over a newer one or lose an event
+_scene_write_lock = threading.Lock()
+
+# Scene images are stored in an images folder under a fresh UUID-prefixed name
+# and never rewritten, so browsers may keep them for good. Any other file served
+# as an image can change and is revalidated against its ETag on every use.
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MUTABLE_FILE_CACHE_CONTROL = "no-cache"
+_UPLOADED_IMAGE_NAME = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}_.+"
+)
+
+
+@dataclass
+class _SceneManifest:
+    """Listing of the scenes tree served by list_scenes."""
+
+    folders: dict[str, dict[str, Any]]  # keyed by path relative to SCENES_DIR
+    scenes: dict[str, dict[str, Any]]  # keyed by scene file path
+    encoded: bytes | None = None  # JSON response body, until the next change
+
+    def encode(self) -> bytes:
+        """Return the listing as a JSON response body."""
+        if self.encoded is None:
+            self.encoded = orjson.dumps(
+                {
+                    "folders": list(self.folders.values()),
+                    "scenes": list(self.scenes.values()),
+                }
+            )
+        return self.encoded
+
+
+@dataclass
+class _SceneManifestState:
+    """The scene manifest and a counter of changes made to the scenes tree."""
+
+    manifest: _SceneManifest | None = None
+    generation: int = 0
+
+
+# The manifest is built from disk on first use, then kept up to date by the
+# endpoints below so listing doesn't walk the tree. Every change bumps the
+# generation so a rebuild that raced with it is discarded instead of stored.
+_scene_manifest_state = _SceneManifestState()
+
+
+def _read_json(path: str) -> Any:
+    """Read and parse a JSON file. Blocking; call via asyncio.to_thread."""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Serialize data to a JSON file. Blocking; call via asyncio.to_thread."""
+    _write_file_atomic(path, orjson.dumps(data))
+
+
+def _write_file_atomic(path: str, payload: bytes) -> None:
+    """
+    Write an already encoded scene file. Blocking; call via asyncio.to_thread.
+
+    The payload is written to a temporary file that is then renamed over the
+    target, so readers never observe a partially written file.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    finally:
+        _invalidate_scene_cache(path)
+
+
+def _load_scene_file(path: str) -> dict[str, Any]:
+    """
+    Parse a scene file with its image log applied, serving unchanged files from
+    the scene cache.
+
+    The returned dict is shared with the cache and must not be mutated.
+    """
+    st = os.stat(path)
+    log_path = _image_log_path(path)
+    try:
+        log_st = os.stat(log_path)
+        log_key: _FileKey | None = (log_st.st_mtime_ns, log_st.st_size)
+    except FileNotFoundError:
+        log_key = None
+    if log_key is not None and log_key[1] > IMAGE_LOG_COMPACT_SIZE:
+        try:
+            _compact_image_log(path)
+        except OSError as e:
+            # The scene still loads with the log applied; compaction is retried
+            # on the next load
+            logger.warning(f"Could not compact image log of {path}: {e}")
+        else:
+            return _load_scene_file(path)
+    key = ((st.st_mtime_ns, st.st_size), log_key)
+    with _scene_cache_lock:
+        entry = _scene_cache.get(path)
+        if entry is not None and entry[0] == key:
+            _scene_cache.move_to_end(path)
+            return entry[1]
+
+    data: dict[str, Any] = _read_json(path)
+    if log_key is not None and not _apply_image_log(data, log_path):
+        # The log was folded into the scene file or discarded after the file
+        # was read, so the data read is already stale
+        return _load_scene_file(path)
+    with _scene_cache_lock:
+        _scene_cache[path] = (key, data)
+        _scene_cache.move_to_end(path)
+        while len(_scene_cache) > SCENE_CACHE_SIZE:
+            _scene_cache.popitem(last=False)
+    return data
+
+
+def _image_log_path(scene_file: str) -> str:
+    """
+    Return the path of a scene's image log.
+
+    Image uploads and deletions are appended to this sidecar file as one JSON
+    event per line instead of rewriting the whole scene file. The log is folded
+    into the scene's images when it is loaded and dropped when the scene file
+    is next rewritten in full, or once it outgrows IMAGE_LOG_COMPACT_SIZE.
+    """
+    return os.path.splitext(scene_file)[0] + ".images.log"
+
+
+def _append_image_event(scene_file: str, event: dict[str, Any]) -> None:
+    """Append an event to a scene's image log. Blocking; call via asyncio.to_thread."""
+    with _scene_write_lock, open(_image_log_path(scene_file), "ab") as f:
+        f.write(orjson.dumps(event) + b"\n")
+
+
+def _apply_image_log(scene_data: dict[str, Any], log_path: str) -> bool:
+    """
+    Fold the events of an image log into the scene's images. Returns False,
+    leaving the scene unchanged, if the log no longer exists.
+    """
+    images: list[dict[str, Any]] = list(scene_data.get("images", []))
+    try:
+        with open(log_path, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return False
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        try:
+            event = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # A torn trailing line from an interrupted append
+            logger.warning(f"Skipping malformed entry in {log_path}")
+            continue
+        op = event.get("op") if isinstance(event, dict) else None
+        image = event.get("image") if op == "add" else None
+        if isinstance(image, dict) and "id" in image:
+            if all(img.get("id") != image["id"] for img in images):
+                images.append(image)
+        elif op == "remove" and "id" in event:
+            images = [img for img in images if img.get("id") != event["id"]]
+        else:
+            logger.warning(f"Skipping invalid event in {log_path}: {event}")
+    scene_data["images"] = images
+    return True
+
+
+def _compact_image_log(scene_file: str) -> None:
+    """Fold a scene's image log into its scene file and delete the log."""
+    with _scene_write_lock:
+        data: dict[str, Any] = _read_json(scene_file)
+        if _apply_image_log(data, _image_log_path(scene_file)):
+            _write_json(scene_file, data)
+            _remove_image_log(scene_file)
+
+
+def _replace_scene_file(
+    scene_file: str, payload: bytes, original_scene_file: str | None = None
+) -> None:
+    """
+    Write a scene file in full, moving it from original_scene_file first if
+    given, and discard the pending image log, whose events the written images
+    list supersedes. Blocking; call via asyncio.to_thread.
+    """
+    with _scene_write_lock:
+        if original_scene_file is not None and original_scene_file != scene_file:
+            # Both paths are inside SCENES_DIR, so this is a plain rename and
+            # never falls back to copying like shutil.move can
+            os.makedirs(os.path.dirname(scene_file), exist_ok=True)
+            os.replace(original_scene_file, scene_file)
+            _invalidate_scene_cache(original_scene_file)
+        _write_file_atomic(scene_file, payload)
+        _remove_image_log(original_scene_file or scene_file)
+
+
+def _delete_scene_file(scene_file: str) -> None:
+    """
+    Delete a scene file and its image log. Blocking; call via asyncio.to_thread.
+    """
+    with _scene_write_lock:
+        os.remove(scene_file)
+        _remove_image_log(scene_file)
+
+
+def _remove_image_log(scene_file: str) -> None:
+    """Delete a scene's image log if it has one."""
+    try:
+        os.remove(_image_log_path(scene_file))
+    except FileNotFoundError:
+        pass
+    _invalidate_scene_cache(scene_file)
+
+
+def _invalidate_scene_cache(path: str) -> None:
+    """Drop a cached scene file, or every cached file below a directory."""
+    prefix = os.path.join(path, "")
+    with _scene_cache_lock:
+        for cached_path in list(_scene_cache):
+            if cached_path == path or cached_path.startswith(prefix):
+                del _scene_cache[cached_path]
+
+
+def _try_load_scene_file(path: str) -> dict[str, Any] | None:
+    """Load a scene file, logging and skipping it if it is unreadable."""
+    try:
+        return _load_scene_file(path)
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Skipping unreadable scene file {path}: {e}")
+        return None
+
+
+def _try_load_scene_files(paths: list[str]) -> list[dict[str, Any] | None]:
+    """Load several scene files sequentially."""
+    return [_try_load_scene_file(path) for path in paths]
+
+
+def _safe_join(base: str, *parts: str) -> str:
+    """
+    Join user-supplied path parts onto base, raising a 400 if the result would
+    be base itself or lie outside of it.
+
+    The check is a prefix test on the normalized path, so it doesn't touch the
+    filesystem the way resolving symlinks with realpath would.
+    """
+    base = os.path.normpath(base)
+    path = os.path.normpath(os.path.join(base, *parts))
+    if not path.startswith(base + os.sep):
+        raise HTTPException(status_code=400, detail="Invalid path")
+    return path
+
+
+def _relative_folder(folder_path: str) -> str:
+    """Return a folder's path relative to SCENES_DIR, as used in the listing."""
+    return os.path.relpath(folder_path, SCENES_DIR)
+
+
+def _folder_entry(relative_path: str) -> dict[str, Any]:
+    """Build the listing entry for a folder."""
+    return {
+        "name": os.path.basename(relative_path),
+        "type": "folder",
+        "path": relative_path,
+        "parent": os.path.dirname(relative_path),
+    }
+
+
+def _scan_scenes_tree(
+    relative_root: str = "",
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """
+    Walk the scenes tree, or the subtree at relative_root, returning folder
+    entries and scene file paths.
+    """
+    folders: list[dict[str, Any]] = []
+    scene_paths: list[str] = []
+
+    def scan_directory(path: str, parent_path: str = "") -> None:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                item = entry.name
+                relative_path = os.path.join(parent_path, item) if parent_path else item
+
+                if entry.is_dir() and item != "__pycache__":
+                    folders.append(_folder_entry(relative_path))
+                    scan_directory(entry.path, relative_path)
+                elif item.endswith(".json") and item != "current_scene.json":
+                    scene_paths.append(entry.path)
+
+    scan_directory(os.path.join(SCENES_DIR, relative_root), relative_root)
+    return folders, scene_paths
+
+
+async def _load_scenes(
+    scene_paths: list[str],
+) -> dict[str, dict[str, Any]]:
+    """
+    Load scene files, keyed by path. Unreadable files are skipped so one
+    corrupt file can't break the whole listing.
+    """
+    results: list[dict[str, Any] | None]
+    if PARALLEL_SCENE_READS:
+        results = await asyncio.gather(
+            *(asyncio.to_thread(_try_load_scene_file, path) for path in scene_paths)
+        )
+    else:
+        results = await asyncio.to_thread(_try_load_scene_files, scene_paths)
+    return {
+        path: scene
+        for path, scene in zip(scene_paths, results, strict=True)
+        if scene is not None
+    }
+
+
+async def _get_scene_manifest() -> _SceneManifest:
+    """Return the scene manifest, building it from disk if needed."""
+    state = _scene_manifest_state
+    if state.manifest is not None:
+        return state.manifest
+
+    generation = state.generation
+    folders, scene_paths = await asyncio.to_thread(_scan_scenes_tree)
+    manifest = _SceneManifest(
+        folders={folder["path"]: folder for folder in folders},
+        scenes=await _load_scenes(scene_paths),
+    )
+    if generation == state.generation:
+        state.manifest = manifest
+    return manifest
+
+
+def invalidate_scene_manifest() -> None:
+    """
+    Discard the scene manifest so it is rebuilt on next use. Call this after
+    changing scene files outside this module.
+    """
+    _scene_manifest_state.manifest = None
+    _scene_manifest_state.generation += 1
+
+
+def discard_image_log(scene_file: str) -> None:
+    """
+    Delete the image log of a scene file that was replaced outside this module,
+    so images logged against the old file aren't added to the new one.
+    """
+    with _scene_write_lock:
+        _remove_image_log(scene_file)
+
+
+def _touch_scene_manifest() -> _SceneManifest | None:
+    """Record a change to the scenes tree and return the manifest to update."""
+    _scene_manifest_state.generation += 1
+    manifest = _scene_manifest_state.manifest
+    if manifest is not None:
+        manifest.encoded = None
+    return manifest
+
+
+def _manifest_add_folder(relative_path: str) -> None:
+    """Add a folder and any missing ancestors to the manifest."""
+    manifest = _touch_scene_manifest()
+    while manifest is not None and relative_path:
+        manifest.folders.setdefault(relative_path, _folder_entry(relative_path))
+        relative_path = os.path.dirname(relative_path)
+
+
+async def _manifest_refresh_scene(scene_file: str) -> None:
+    """Reload a scene into the manifest after its file changed."""
+    generation = _scene_manifest_state.generation
+    scene = await asyncio.to_thread(_try_load_scene_file, scene_file)
+    if generation != _scene_manifest_state.generation:
+        # The tree changed while the scene loaded, e.g. it was deleted or moved,
+        # so the loaded scene may be stale and is not stored
+        invalidate_scene_manifest()
+        return
+    manifest = _touch_scene_manifest()
+    if manifest is not None and scene is not None:
+        manifest.scenes[scene_file] = scene
+
+
+def _manifest_remove_scene(scene_file: str) -> None:
+    """Drop a deleted or moved scene from the manifest."""
+    manifest = _touch_scene_manifest()
+    if manifest is not None:
+        manifest.scenes.pop(scene_file, None)
+
+
+def _manifest_remove_folder(relative_path: str) -> None:
+    """Drop a folder and everything below it from the manifest."""
+    manifest = _touch_scene_manifest()
+    if manifest is None:
+        return
+    folder_prefix = relative_path + "/"
+    for path in list(manifest.folders):
+        if path == relative_path or path.startswith(folder_prefix):
+            del manifest.folders[path]
+    scene_prefix = os.path.join(SCENES_DIR, relative_path, "")
+    for path in list(manifest.scenes):
+        if path.startswith(scene_prefix):
+            del manifest.scenes[path]
+
+
+async def _manifest_add_tree(relative_path: str) -> None:
+    """Add a folder and everything below it to the manifest."""
+    generation = _scene_manifest_state.generation
+    folders, scene_paths = await asyncio.to_thread(_scan_scenes_tree, relative_path)
+    scenes = await _load_scenes(scene_paths)
+    if generation != _scene_manifest_state.generation:
+        # Like _manifest_refresh_scene, a scan that raced a change is dropped
+        invalidate_scene_manifest()
+        return
+    _manifest_add_folder(relative_path)
+    manifest = _touch_scene_manifest()
+    if manifest is not None:
+        manifest.folders.update((folder["path"], folder) for folder in folders)
+        manifest.scenes.update(scenes)
+
+
+def _find_scene_file(scene_id: str) -> str | None:
+    """
+    Search the scenes tree for the file of a scene. Blocking; call via
+    asyncio.to_thread.
+
+    Scene files are named after the scene ID, so only directory entries are
+    compared and no file has to be opened.
+    """
+    file_name = f"{scene_id}.json"
+
+    def search_directory(path: str) -> str | None:
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name == file_name and entry.is_file():
+                    return entry.path
+                if entry.is_dir() and entry.name != "__pycache__":
+                    subdirs.append(entry.path)
+        for subdir in subdirs:
+            found = search_directory(subdir)
+            if found:
+                return found
+        return None
+
+    return search_directory(SCENES_DIR)
+
 
 @router.post("/save")
 async def save_scene(scene: SceneData) -> dict[str, str]:
@@ -26,52 +500,39 @@ async def save_scene(scene: SceneData) -> dict[str, str]:
     try:
         scene.id = str(uuid.uuid4())
         # Create folder if it doesn't exist
-        if scene.folder:
-            folder_path = os.path.join(SCENES_DIR, scene.folder)
+        folder_path = _safe_join(SCENES_DIR, scene.folder) if scene.folder else None
+        if folder_path:
             os.makedirs(folder_path, exist_ok=True)
             scene_file = os.path.join(folder_path, f"{scene.id}.json")
         else:
             scene_file = os.path.join(SCENES_DIR, f"{scene.id}.json")
 
-        with open(file=scene_file, mode="w", encoding="utf-8") as f:
-            json.dump(scene.model_dump(by_alias=True), f)
+        # model_dump_json serializes straight from the model in pydantic-core,
+        # skipping the intermediate dict that model_dump() would build
+        payload = scene.model_dump_json(by_alias=True).encode()
+        await asyncio.to_thread(_write_file_atomic, scene_file, payload)
+        if folder_path:
+            _manifest_add_folder(_relative_folder(folder_path))
+        await _manifest_refresh_scene(scene_file)
         return {"message": "Scene saved successfully"}
+    except HTTPException as e:
+        logger.exception(f"HTTPException in save_scene: {e}")
+        raise
     except Exception as e:
         logger.exception(f"Error saving scene: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @router.get("/list")
-async def list_scenes() -> dict[str, Any]:
+async def list_scenes() -> Response:
     """
     List all scenes.
     """
     try:
-        scenes: list[dict[str, Any]] = []
-        folders: list[dict[str, Any]] = []
-
-        def scan_directory(path: str, parent_path: str = "") -> None:
-            for item in os.listdir(path):
-                item_path = os.path.join(path, item)
-                relative_path = os.path.join(parent_path, item) if parent_path else item
-
-                if os.path.isdir(item_path) and item != "__pycache__":
-                    folders.append(
-                        {
-                            "name": item,
-                            "type": "folder",
-                            "path": relative_path,
-                            "parent": parent_path,
-                        }
-                    )
-                    scan_directory(item_path, relative_path)
-                elif item.endswith(".json") and item != "current_scene.json":
-                    with open(file=item_path, encoding="utf-8") as f:
-                        scene_data = json.load(f)
-                        scenes.append(scene_data)
-
-        scan_directory(SCENES_DIR)
-        return {"folders": folders, "scenes": scenes}
+        manifest = await _get_scene_manifest()
+        # The listing is returned pre-encoded, skipping FastAPI's validation and
+        # serialization of every scene dict
+        return Response(content=manifest.encode(), media_type="application/json")
     except Exception as e:
         logger.exception(f"Error listing scenes: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -83,17 +544,19 @@ async def create_folder(request: FolderCreateRequest) -> dict[str, str]:
     Create a folder.
     """
     try:
-        if request.parent_folder:
-            folder_path = os.path.join(
-                SCENES_DIR, request.parent_folder, request.folder_name
-            )
-        else:
-            folder_path = os.path.join(SCENES_DIR, request.folder_name)
+        folder_path = _safe_join(
+            SCENES_DIR, request.parent_folder or "", request.folder_name
+        )
 
-        if os.path.exists(folder_path):
-            raise HTTPException(status_code=400, detail="Folder already exists")
-        os.makedirs(folder_path)
+        try:
+            os.makedirs(folder_path)
+        except FileExistsError as e:
+            raise HTTPException(status_code=400, detail="Folder already exists") from e
+        _manifest_add_folder(_relative_folder(folder_path))
         return {"message": "Folder created successfully"}
+    except HTTPException as e:
+        logger.exception(f"HTTPException in create_folder: {e}")
+        raise
     except Exception as e:
         logger.exception(f"Error creating folder: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -105,11 +568,17 @@ async def delete_folder(folder_path: str) -> dict[str, str]:
     Delete a folder.
     """
     try:
-        folder_path = os.path.join(SCENES_DIR, folder_path)
-        if not os.path.exists(folder_path):
-            raise HTTPException(status_code=404, detail="Folder not found")
-        shutil.rmtree(folder_path)
+        folder_path = _safe_join(SCENES_DIR, folder_path)
+        try:
+            await asyncio.to_thread(shutil.rmtree, folder_path)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail="Folder not found") from e
+        _invalidate_scene_cache(folder_path)
+        _manifest_remove_folder(_relative_folder(folder_path))
         return {"message": "Folder deleted successfully"}
+    except HTTPException as e:
+        logger.exception(f"HTTPException in delete_folder: {e}")
+        raise
     except Exception as e:
         logger.exception(f"Error deleting folder: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -121,28 +590,11 @@ async def load_scene(scene_id: str) -> dict[str, Any]:
     Load a scene.
     """
     try:
-        # First get the scene data to find its folder
-        scene_data = None
-        # scene_file = None
-
-        # Search through all scenes to find the one with matching ID
-        for root, _, files in os.walk(SCENES_DIR):
-            for file in files:
-                if file.endswith(".json") and file != "current_scene.json":
-                    file_path = os.path.join(root, file)
-                    with open(file=file_path, encoding="utf-8") as f:
-                        data: dict[str, Any] = json.load(f)
-                        if data["id"] == scene_id:
-                            scene_data = data
-                            # scene_file = file_path
-                            break
-            if scene_data:
-                break
-
-        if not scene_data:
+        scene_file = await asyncio.to_thread(_find_scene_file, scene_id)
+        if not scene_file:
             raise HTTPException(status_code=404, detail="Scene not found")
 
-        return scene_data
+        return await asyncio.to_thread(_load_scene_file, scene_file)
     except HTTPException as e:
         logger.exception(f"HTTPException in load_scene: {e}")
         raise
@@ -157,20 +609,15 @@ async def delete_scene(scene_id: str) -> dict[str, str]:
     Delete a scene.
     """
     try:
-        # First check in root directory
-        scene_file = os.path.join(SCENES_DIR, f"{scene_id}.json")
-        if not os.path.exists(scene_file):
-            # If not found, search in all folders
-            for folder in os.listdir(SCENES_DIR):
-                folder_path = os.path.join(SCENES_DIR, folder)
-                if os.path.isdir(folder_path):
-                    scene_file = os.path.join(folder_path, f"{scene_id}.json")
-                    if os.path.exists(scene_file):
-                        break
-            else:
-                raise HTTPException(status_code=404, detail="Scene not found")
+        scene_file = await asyncio.to_thread(_find_scene_file, scene_id)
+        if not scene_file:
+            raise HTTPException(status_code=404, detail="Scene not found")
 
-        os.remove(scene_file)
+        try:
+            await asyncio.to_thread(_delete_scene_file, scene_file)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail="Scene not found") from e
+        _manifest_remove_scene(scene_file)
         return {"message": "Scene deleted successfully"}
     except HTTPException as e:
         logger.exception(f"HTTPException in delete_scene: {e}")
@@ -186,34 +633,26 @@ async def update_scene(scene_id: str, scene: SceneData) -> dict[str, str]:
     Update a scene.
     """
     try:
-        # Search through all directories to find the scene file
-        scene_file = None
-        for root, _, files in os.walk(SCENES_DIR):
-            for file in files:
-                if file.endswith(".json") and file != "current_scene.json":
-                    file_path = os.path.join(root, file)
-                    with open(file=file_path, encoding="utf-8") as f:
-                        data = json.load(f)
-                        if data["id"] == scene_id:
-                            scene_file = file_path
-                            break
-            if scene_file:
-                break
-
-        if not scene_file:
+        original_scene_file = await asyncio.to_thread(_find_scene_file, scene_id)
+        if not original_scene_file:
             raise HTTPException(status_code=404, detail="Scene not found")
+        scene_file = original_scene_file
 
         # If scene is being moved to a different folder
+        new_folder_path = None
         if scene.folder:
-            new_folder_path = os.path.join(SCENES_DIR, scene.folder)
-            os.makedirs(new_folder_path, exist_ok=True)
-            new_scene_file = os.path.join(new_folder_path, f"{scene_id}.json")
-            if scene_file != new_scene_file:
-                shutil.move(scene_file, new_scene_file)
-                scene_file = new_scene_file
-
-        with open(file=scene_file, mode="w", encoding="utf-8") as f:
-            json.dump(scene.model_dump(by_alias=True), f)
+            new_folder_path = _safe_join(SCENES_DIR, scene.folder)
+            scene_file = os.path.join(new_folder_path, f"{scene_id}.json")
+
+        payload = scene.model_dump_json(by_alias=True).encode()
+        await asyncio.to_thread(
+            _replace_scene_file, scene_file, payload, original_scene_file
+        )
+        if scene_file != original_scene_file:
+            _manifest_remove_scene(original_scene_file)
+        if new_folder_path:
+            _manifest_add_folder(_relative_folder(new_folder_path))
+        await _manifest_refresh_scene(scene_file)
         return {"message": "Scene updated successfully"}
     except HTTPException as e:
         logger.exception(f"HTTPException in update_scene: {e}")
@@ -231,15 +670,7 @@ async def upload_scene_image(
     Upload a scene image.
     """
     try:
-        # Find the scene file
-        scene_file = None
-        for root, _, files in os.walk(SCENES_DIR):
-            for f in files:
-                if f == f"{scene_id}.json":
-                    scene_file = os.path.join(root, f)
-                    break
-            if scene_file:
-                break
+        scene_file = await asyncio.to_thread(_find_scene_file, scene_id)
 
         if not scene_file:
             raise HTTPException(status_code=404, detail="Scene not found")
@@ -251,42 +682,78 @@ async def upload_scene_image(
 
         # Save the image
         image_id = str(uuid.uuid4())
-        image_path = os.path.join(images_dir, f"{image_id}_{file.filename}")
-        file_content = await file.read()
+        image_path = _safe_join(images_dir, f"{image_id}_{file.filename}")
         with open(image_path, "wb") as buffer:
-            buffer.write(file_content)
-
-        # Update scene data
-        with open(file=scene_file, encoding="utf-8") as buffer:
-            scene_data = json.load(buffer)
-
-        scene_data["images"].append(
-            {
-                "id": image_id,
-                "name": file.filename,
-                "path": os.path.relpath(image_path, SCENES_DIR),
-            }
-        )
+            await asyncio.to_thread(
+                shutil.copyfileobj, file.file, buffer, UPLOAD_CHUNK_SIZE
+            )
 
-        with open(file=scene_file, mode="w", encoding="utf-8") as buffer:
-            json.dump(scene_data, buffer)
+        # Record the image in the scene's image log
+        image = {
+            "id": image_id,
+            "name": file.filename,
+            "path": os.path.relpath(image_path, SCENES_DIR),
+        }
+        await asyncio.to_thread(
+            _append_image_event, scene_file, {"op": "add", "image": image}
+        )
+        _manifest_add_folder(_relative_folder(images_dir))
+        await _manifest_refresh_scene(scene_file)
 
         return {"message": "Image uploaded successfully", "image_id": image_id}
+    except HTTPException as e:
+        logger.exception(f"HTTPException in upload_scene_image: {e}")
+        raise
     except Exception as e:
         logger.exception(f"Error in upload_scene_image: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check whether an If-None-Match header matches an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def _is_uploaded_image(file_path: str) -> bool:
+    """Check whether a file is a scene image stored by upload_scene_image."""
+    folder, name = os.path.split(file_path)
+    return os.path.basename(folder) == "images" and bool(
+        _UPLOADED_IMAGE_NAME.fullmatch(name)
+    )
+
+
 @router.get("/image/{image_path:path}")
-async def get_scene_image(image_path: str) -> FileResponse:
+async def get_scene_image(image_path: str, request: Request) -> Response:
     """
-    Get a scene image.
+    Get a scene image. Answers 304 Not Modified when the client already has the
+    current version.
     """
     try:
-        file_path = os.path.join(SCENES_DIR, image_path)
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="Image not found")
-        return FileResponse(file_path)
+        file_path = _safe_join(SCENES_DIR, image_path)
+        try:
+            stat_result = os.stat(file_path)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail="Image not found") from e
+
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        cache_control = (
+            IMAGE_CACHE_CONTROL
+            if _is_uploaded_image(file_path)
+            else MUTABLE_FILE_CACHE_CONTROL
+        )
+        headers = {"Cache-Control": cache_control, "ETag": etag}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        # Hand over the stat result so the response doesn't stat the file again
+        return FileResponse(file_path, headers=headers, stat_result=stat_result)
+    except HTTPException as e:
+        logger.exception(f"HTTPException in get_scene_image: {e}")
+        raise
     except Exception as e:
         logger.exception(f"Error in get_scene_image: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -298,22 +765,13 @@ async def delete_scene_image(scene_id: str, image_id: str) -> dict[str, str]:
     Delete a scene image.
     """
     try:
-        # Find the scene file
-        scene_file = None
-        for root, _, files in os.walk(SCENES_DIR):
-            for f in files:
-                if f == f"{scene_id}.json":
-                    scene_file = os.path.join(root, f)
-                    break
-            if scene_file:
-                break
+        scene_file = await asyncio.to_thread(_find_scene_file, scene_id)
 
         if not scene_file:
             raise HTTPException(status_code=404, detail="Scene not found")
 
-        # Update scene data and delete image
-        with open(file=scene_file, encoding="utf-8") as buffer:
-            scene_data = json.load(buffer)
+        # Look up the image and delete it
+        scene_data = await asyncio.to_thread(_load_scene_file, scene_file)
 
         image_to_delete = None
         for image in scene_data["images"]:
@@ -325,37 +783,75 @@ async def delete_scene_image(scene_id: str, image_id: str) -> dict[str, str]:
             raise HTTPException(status_code=404, detail="Image not found")
 
         # Delete the image file
-        image_path = os.path.join(SCENES_DIR, image_to_delete["path"])
-        if os.path.exists(image_path):
-            os.remove(image_path)
-
-        # Update scene data
-        scene_data["images"] = [
-            img for img in scene_data["images"] if img["id"] != image_id
-        ]
-        with open(file=scene_file, mode="w", encoding="utf-8") as buffer:
-            json.dump(scene_data, buffer)
+        image_path = _safe_join(SCENES_DIR, image_to_delete["path"])
+        try:
+            await asyncio.to_thread(os.remove, image_path)
+        except FileNotFoundError:
+            pass
+
+        # Record the removal in the scene's image log
+        await asyncio.to_thread(
+            _append_image_event, scene_file, {"op": "remove", "id": image_id}
+        )
+        await _manifest_refresh_scene(scene_file)
 
         return {"message": "Image deleted successfully"}
+    except HTTPException as e:
+        logger.exception(f"HTTPException in delete_scene_image: {e}")
+        raise
     except Exception as e:
         logger.exception(f"Error in delete_scene_image: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+def _update_scene_folders(old_folder: str, new_folder: str) -> None:
+    """
+    Point scenes stored under a renamed folder at its new path.
+
+    Scenes live in the directory named by their folder field, so only the
+    renamed subtree has to be scanned, including scenes in nested subfolders.
+    """
+    old_prefix = old_folder + "/"
+    for root, _, files in os.walk(os.path.join(SCENES_DIR, new_folder)):
+        for file in files:
+            if file.endswith(".json") and file != "current_scene.json":
+                file_path = os.path.join(root, file)
+                try:
+                    with _scene_write_lock:
+                        scene_data = _read_json(file_path)
+
+                        # Check if this scene's folder needs updating
+                        folder = scene_data.get("folder")
+                        if folder == old_folder:
+                            scene_data["folder"] = new_folder
+                        elif folder and folder.startswith(old_prefix):
+                            scene_data["folder"] = (
+                                new_folder + folder[len(old_folder) :]
+                            )
+                        else:
+                            continue
+                        _write_json(file_path, scene_data)
+                except FileNotFoundError as e:
+                    logger.exception(f"FileNotFoundError in rename_folder: {e}")
+                    # Continue even if one scene fails to update
+                    continue
+                except orjson.JSONDecodeError as e:
+                    logger.exception(f"JSONDecodeError in rename_folder: {e}")
+                    # Continue even if one scene fails to update
+                    continue
+
+
 @router.put("/folder/{folder_path:path}")
 async def rename_folder(
     folder_path: str, request: FolderRenameRequest
 ) -> dict[str, str]:
     """Rename a folder in the scenes directory."""
     try:
-        # Ensure folder exists
-        old_path = os.path.join(SCENES_DIR, folder_path)
-        if not os.path.exists(old_path):
-            raise HTTPException(status_code=404, detail="Folder not found")
+        old_path = _safe_join(SCENES_DIR, folder_path)
 
         # Get parent path and construct new path
         parent_dir = os.path.dirname(old_path)
-        new_path = os.path.join(parent_dir, request.new_name)
+        new_path = _safe_join(parent_dir, request.new_name)
 
         # Check if destination exists
         if os.path.exists(new_path):
@@ -365,32 +861,18 @@ async def rename_folder(
             )
 
         # Rename folder
-        os.rename(old_path, new_path)
+        try:
+            await asyncio.to_thread(os.rename, old_path, new_path)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail="Folder not found") from e
+        _invalidate_scene_cache(old_path)
 
         # Update all scenes that reference this folder
-        for root, _, files in os.walk(SCENES_DIR):
-            for file in files:
-                if file.endswith(".json") and file != "current_scene.json":
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file=file_path, encoding="utf-8") as buffer:
-                            scene_data = json.load(buffer)
-
-                        # Check if this scene's folder needs updating
-                        if scene_data.get("folder") == folder_path:
-                            scene_data["folder"] = request.new_name
-                            with open(
-                                file=file_path, mode="w", encoding="utf-8"
-                            ) as buffer:
-                                json.dump(scene_data, buffer)
-                    except FileNotFoundError as e:
-                        logger.exception(f"FileNotFoundError in rename_folder: {e}")
-                        # Continue even if one scene fails to update
-                        continue
-                    except json.JSONDecodeError as e:
-                        logger.exception(f"JSONDecodeError in rename_folder: {e}")
-                        # Continue even if one scene fails to update
-                        continue
+        old_folder = _relative_folder(old_path)
+        new_folder = _relative_folder(new_path)
+        await asyncio.to_thread(_update_scene_folders, old_folder, new_folder)
+        _manifest_remove_folder(old_folder)
+        await _manifest_add_tree(new_folder)
 
         return {"message": "Folder renamed successfully"}
     except HTTPException as e:
@@ -3,10 +3,12 @@ This module contains the websocket routes for the FastAPI app.
 """
 
 import asyncio
-import json
 import os
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from typing import Any
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from loguru import logger
 from starlette.websockets import WebSocketState
@@ -15,100 +17,238 @@ from ..core.constants import SCENES_DIR
 
 router = APIRouter()
 
-# Store connected clients
-clients: set[WebSocket] = set()
-# Lock for thread-safe operations
-clients_lock = asyncio.Lock()
-# Debounced scene persistence
-_pending_scene_save: dict[str, Any] | None = None
-_scene_save_task: asyncio.Task[None] | None = None
-SCENE_SAVE_DEBOUNCE_SEC = 1.0
 
+class _QueuedScene:
+    """Queue marker standing in for a client's latest pending scene."""
+
+
+_QUEUED_SCENE = _QueuedScene()
+
+
+@dataclass
+class _ClientOutbox:
+    """
+    A client's outgoing messages, drained by its writer task.
+
+    A scene_update carries the whole scene, so only the newest one matters.
+    It is held in the scene slot with a single marker in the queue, and a
+    newer scene replaces it in place rather than queueing behind it.
+    """
+
+    queue: asyncio.Queue[str | _QueuedScene | None]
+    scene: str | None = None
 
-async def broadcast_scene_update(scene_data: dict[str, Any]) -> None:
-    """Broadcast scene update to all connected clients"""
-    message = {"type": "scene_update", "scene": scene_data}
-    await _broadcast_to_all_clients(message)
 
+# Connected clients with their outboxes. Each client's outbox is drained by its
+# own writer task, so a broadcast only enqueues and never waits on a client's
+# network. A client that falls CLIENT_QUEUE_SIZE messages behind is
+# disconnected and resyncs from the current scene when it reconnects. Only
+# touched from the event loop, so no lock is needed.
+CLIENT_QUEUE_SIZE = 64
+clients: dict[WebSocket, _ClientOutbox] = {}
+# Incoming messages buffered per client while a batch is handled. When it is
+# full the client's messages are no longer read, which throttles a client that
+# sends faster than its messages can be handled.
+CLIENT_INBOX_SIZE = 64
+# The scene shown on the table; SCENES_DIR itself is created at import by
+# core.constants
+_SCENE_FILE = os.path.join(SCENES_DIR, "current_scene.json")
+# The latest scene is written at most once per interval, however many updates
+# arrive in between
+SCENE_SAVE_INTERVAL_SEC = 1.0
 
-async def _broadcast_to_all_clients(message: dict[str, Any]) -> None:
-    """Broadcast a message to all connected clients."""
-    async with clients_lock:
-        disconnected_clients = set()
-        for client in clients:
-            try:
-                await client.send_json(message)
-            except (WebSocketDisconnect, RuntimeError, ConnectionError) as e:
-                logger.exception(f"Error broadcasting to client: {e}")
-                disconnected_clients.add(client)
 
-        # Remove disconnected clients
-        clients.difference_update(disconnected_clients)
+@dataclass
+class _SceneFileState:
+    """Saving and reading of the current scene file."""
+
+    # Newest scene not yet written, and the task that writes it
+    pending_save: dict[str, Any] | None = None
+    save_task: asyncio.Task[None] | None = None
+    # Encoded initial-scene message, keyed by the (mtime, size) of the scene file
+    initial_message: tuple[tuple[int, int], str] | None = None
+
+
+_scene_file_state = _SceneFileState()
+
+
+def _encode_message(message: dict[str, Any]) -> str:
+    """
+    Serialize a message for sending.
+
+    Messages go out as text frames since the frontend parses event.data as a
+    JSON string.
+    """
+    return orjson.dumps(message).decode()
+
 
+# Messages that never change, encoded once at import
+_CONNECTED_MESSAGE = _encode_message(
+    {"type": "connection_status", "status": "connected"}
+)
+_BLANK_VIEWER_MESSAGE = _encode_message({"type": "blank_viewer", "isBlank": True})
+_UNBLANK_VIEWER_MESSAGE = _encode_message({"type": "unblank_viewer", "isBlank": False})
+_ROTATE_VIEWER_MESSAGE = _encode_message({"type": "rotate_viewer", "isRotated": True})
+_UNROTATE_VIEWER_MESSAGE = _encode_message(
+    {"type": "unrotate_viewer", "isRotated": False}
+)
 
-async def _broadcast_to_others(websocket: WebSocket, message: dict[str, Any]) -> None:
+
+def _broadcast_encoded(
+    payload: str, exclude: WebSocket | None = None, is_scene: bool = False
+) -> None:
+    """
+    Queue an already encoded message for all connected clients but exclude.
+
+    With is_scene, the payload replaces any scene a client has not been sent
+    yet instead of queueing behind it.
+    """
+    for client, outbox in list(clients.items()):
+        if client is exclude:
+            continue
+        if client.client_state != WebSocketState.CONNECTED:
+            # Closed but not yet cleaned up; its endpoint will cancel the writer
+            clients.pop(client, None)
+            continue
+        item: str | _QueuedScene = payload
+        if is_scene:
+            already_queued = outbox.scene is not None
+            outbox.scene = payload
+            if already_queued:
+                continue
+            item = _QUEUED_SCENE
+        try:
+            outbox.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning("Disconnecting client that stopped keeping up")
+            _drop_client(client, outbox)
+
+
+def _drop_client(websocket: WebSocket, outbox: _ClientOutbox) -> None:
+    """Stop broadcasting to a client and have its writer close the connection."""
+    clients.pop(websocket, None)
+    outbox.scene = None
+    while not outbox.queue.empty():
+        outbox.queue.get_nowait()
+    outbox.queue.put_nowait(None)
+
+
+def _broadcast_to_others(websocket: WebSocket, message: dict[str, Any]) -> None:
     """Broadcast a message to all clients except the sender."""
-    async with clients_lock:
-        disconnected_clients = set()
-        for client in clients:
-            if client != websocket:  # Don't send back to the sender
-                try:
-                    await client.send_json(message)
-                except (WebSocketDisconnect, RuntimeError, ConnectionError) as e:
-                    logger.exception(f"Error broadcasting to client: {e}")
-                    disconnected_clients.add(client)
-
-        # Remove disconnected clients
-        clients.difference_update(disconnected_clients)
-
-
-async def _send_initial_scene(websocket: WebSocket) -> None:
-    """Send the current scene to a newly connected client."""
+    _broadcast_encoded(_encode_message(message), exclude=websocket)
+
+
+def _broadcast_scene(
+    scene_data: dict[str, Any], exclude: WebSocket | None = None
+) -> None:
+    """Broadcast a scene, superseding any scene a client has not been sent."""
+    message = {"type": "scene_update", "scene": scene_data}
+    _broadcast_encoded(_encode_message(message), exclude=exclude, is_scene=True)
+
+
+async def _client_writer(websocket: WebSocket, outbox: _ClientOutbox) -> None:
+    """Send a client's queued messages until it disconnects or is dropped."""
+    try:
+        while True:
+            item = await outbox.queue.get()
+            if item is None:
+                # 1013 (try again later) makes the frontend reconnect
+                await websocket.close(code=1013)
+                return
+            if isinstance(item, _QueuedScene):
+                payload, outbox.scene = outbox.scene, None
+                if payload is None:
+                    continue
+            else:
+                payload = item
+            if websocket.client_state != WebSocketState.CONNECTED:
+                return
+            await websocket.send_text(payload)
+    except WebSocketDisconnect as e:
+        # The client going away mid-send is expected, so no traceback
+        logger.debug(f"Client disconnected while sending: {e}")
+    except (RuntimeError, ConnectionError) as e:
+        logger.exception(f"Error sending to client: {e}")
+    finally:
+        clients.pop(websocket, None)
+
+
+def _initial_scene_message() -> str | None:
+    """
+    Build the message carrying the current scene for a newly connected client.
+
+    The encoded message is reused until the scene file changes, so a burst of
+    connections reads and encodes the scene only once.
+    """
+    state = _scene_file_state
     try:
-        scene_file = os.path.join(SCENES_DIR, "current_scene.json")
-        if os.path.exists(scene_file):
-            with open(file=scene_file, encoding="utf-8") as f:
-                scene_data = json.load(f)
-                await websocket.send_json({"type": "scene_update", "scene": scene_data})
-    except (OSError, json.JSONDecodeError) as e:
-        logger.exception(f"Error sending initial scene: {e}")
+        try:
+            st = os.stat(_SCENE_FILE)
+        except FileNotFoundError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        if state.initial_message is not None and state.initial_message[0] == key:
+            return state.initial_message[1]
+
+        with open(_SCENE_FILE, "rb") as f:
+            scene_data = orjson.loads(f.read())
+        message = _encode_message({"type": "scene_update", "scene": scene_data})
+        state.initial_message = (key, message)
+        return message
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.exception(f"Error loading initial scene: {e}")
+    return None
+
+
+def _write_scene_file(payload: bytes) -> None:
+    """
+    Replace the current scene file. Blocking; call via asyncio.to_thread.
+
+    The payload goes to a temporary file that is renamed over the scene file,
+    so a newly connecting client never reads a half-written scene. Saves are
+    serialized by the flush task, so a fixed temporary name is safe.
+    """
+    tmp_path = f"{_SCENE_FILE}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, _SCENE_FILE)
 
 
 async def _save_scene_data(scene_data: dict[str, Any]) -> None:
     """Save scene data to file."""
     try:
-        scene_file = os.path.join(SCENES_DIR, "current_scene.json")
-        os.makedirs(os.path.dirname(scene_file), exist_ok=True)
-        with open(file=scene_file, mode="w", encoding="utf-8") as f:
-            json.dump(scene_data, f)
-    except (OSError, json.JSONDecodeError) as e:
+        # Encoding stays on the loop; only the file I/O is handed to a thread
+        payload = orjson.dumps(scene_data)
+        await asyncio.to_thread(_write_scene_file, payload)
+    except (OSError, orjson.JSONEncodeError) as e:
         logger.exception(f"Error saving scene: {e}")
+    finally:
+        _scene_file_state.initial_message = None
 
 
-async def _schedule_scene_save(scene_data: dict[str, Any]) -> None:
-    """Persist scene to disk after a quiet period to avoid write storms during drag."""
-    global _pending_scene_save, _scene_save_task
-    _pending_scene_save = scene_data
-    if _scene_save_task and not _scene_save_task.done():
-        _scene_save_task.cancel()
-        try:
-            await _scene_save_task
-        except asyncio.CancelledError:
-            pass
+def _schedule_scene_save(scene_data: dict[str, Any]) -> None:
+    """Persist the scene soon, coalescing with other pending updates."""
+    state = _scene_file_state
+    state.pending_save = scene_data
+    if state.save_task is None or state.save_task.done():
+        state.save_task = asyncio.create_task(_flush_scene_saves())
 
-    async def _debounced_save() -> None:
-        await asyncio.sleep(SCENE_SAVE_DEBOUNCE_SEC)
-        if _pending_scene_save is not None:
-            await _save_scene_data(_pending_scene_save)
 
-    _scene_save_task = asyncio.create_task(_debounced_save())
+async def _flush_scene_saves() -> None:
+    """Write pending scene updates until none arrive during a write."""
+    state = _scene_file_state
+    while state.pending_save is not None:
+        await asyncio.sleep(SCENE_SAVE_INTERVAL_SEC)
+        scene_data, state.pending_save = state.pending_save, None
+        if scene_data is not None:
+            await _save_scene_data(scene_data)
 
 
 async def _handle_scene_update(websocket: WebSocket, message: dict[str, Any]) -> None:
     """Handle scene update messages."""
     scene_data = message.get("scene", {})
-    await _schedule_scene_save(scene_data)
-    await _broadcast_to_others(websocket, {"type": "scene_update", "scene": scene_data})
+    _schedule_scene_save(scene_data)
+    _broadcast_scene(scene_data, exclude=websocket)
 
 
 async def _handle_highlight_marker(
@@ -118,35 +258,31 @@ async def _handle_highlight_marker(
     marker_id = message.get("markerId")
     if marker_id:
         highlight_message = {"type": "highlight_marker", "markerId": marker_id}
-        await _broadcast_to_others(websocket, highlight_message)
+        _broadcast_to_others(websocket, highlight_message)
 
 
 async def _handle_blank_viewer(websocket: WebSocket, _message: dict[str, Any]) -> None:
     """Handle blank viewer messages."""
-    blank_message = {"type": "blank_viewer", "isBlank": True}
-    await _broadcast_to_others(websocket, blank_message)
+    _broadcast_encoded(_BLANK_VIEWER_MESSAGE, exclude=websocket)
 
 
 async def _handle_unblank_viewer(
     websocket: WebSocket, _message: dict[str, Any]
 ) -> None:
     """Handle unblank viewer messages."""
-    unblank_message = {"type": "unblank_viewer", "isBlank": False}
-    await _broadcast_to_others(websocket, unblank_message)
+    _broadcast_encoded(_UNBLANK_VIEWER_MESSAGE, exclude=websocket)
 
 
 async def _handle_rotate_viewer(websocket: WebSocket, _message: dict[str, Any]) -> None:
     """Handle rotate viewer messages."""
-    rotate_message = {"type": "rotate_viewer", "isRotated": True}
-    await _broadcast_to_others(websocket, rotate_message)
+    _broadcast_encoded(_ROTATE_VIEWER_MESSAGE, exclude=websocket)
 
 
 async def _handle_unrotate_viewer(
     websocket: WebSocket, _message: dict[str, Any]
 ) -> None:
     """Handle unrotate viewer messages."""
-    unrotate_message = {"type": "unrotate_viewer", "isRotated": False}
-    await _broadcast_to_others(websocket, unrotate_message)
+    _broadcast_encoded(_UNROTATE_VIEWER_MESSAGE, exclude=websocket)
 
 
 async def _handle_scene_event(websocket: WebSocket, message: dict[str, Any]) -> None:
@@ -158,10 +294,40 @@ async def _handle_scene_event(websocket: WebSocket, message: dict[str, Any]) ->
     for key in ("x", "y", "enabled", "brightness", "points"):
         if key in message:
             payload[key] = message[key]
-    await _broadcast_to_others(websocket, payload)
+    _broadcast_to_others(websocket, payload)
+
 
+_MessageHandler = Callable[[WebSocket, dict[str, Any]], Awaitable[None]]
 
-async def _handle_websocket_message(websocket: WebSocket, data: str) -> bool:
+# Handlers by message type; other types (e.g. the client's keepalive ping) are
+# ignored
+_MESSAGE_HANDLERS: dict[str, _MessageHandler] = {
+    "scene_update": _handle_scene_update,
+    "highlight_marker": _handle_highlight_marker,
+    "blank_viewer": _handle_blank_viewer,
+    "unblank_viewer": _handle_unblank_viewer,
+    "rotate_viewer": _handle_rotate_viewer,
+    "unrotate_viewer": _handle_unrotate_viewer,
+    "scene_event": _handle_scene_event,
+}
+
+
+def _parse_websocket_message(data: str) -> dict[str, Any] | None:
+    """Parse an incoming message, returning None if it isn't valid JSON."""
+    try:
+        message: dict[str, Any] = orjson.loads(data)
+    except orjson.JSONDecodeError as e:
+        logger.exception(f"Error handling message: {e}")
+        return None
+    # The log file sink records DEBUG, so only the type and size are logged
+    # rather than formatting and writing out the whole scene on every update
+    logger.debug(f"Received {message.get('type')} message ({len(data)} bytes)")
+    return message
+
+
+async def _handle_websocket_message(
+    websocket: WebSocket, message: dict[str, Any]
+) -> bool:
     """
     Handle a single websocket message.
 
@@ -169,36 +335,78 @@ async def _handle_websocket_message(websocket: WebSocket, data: str) -> bool:
         bool: True to continue processing, False to break the loop
     """
     try:
-        message = json.loads(data)
-        logger.debug(f"Received message: {message}")
-
-        message_type = message.get("type")
-        if message_type == "scene_update":
-            await _handle_scene_update(websocket, message)
-        elif message_type == "highlight_marker":
-            await _handle_highlight_marker(websocket, message)
-        elif message_type == "blank_viewer":
-            await _handle_blank_viewer(websocket, message)
-        elif message_type == "unblank_viewer":
-            await _handle_unblank_viewer(websocket, message)
-        elif message_type == "rotate_viewer":
-            await _handle_rotate_viewer(websocket, message)
-        elif message_type == "unrotate_viewer":
-            await _handle_unrotate_viewer(websocket, message)
-        elif message_type == "scene_event":
-            await _handle_scene_event(websocket, message)
-
+        handler = _MESSAGE_HANDLERS.get(message.get("type"))
+        if handler:
+            await handler(websocket, message)
         return True
 
-    except (json.JSONDecodeError, ConnectionError) as e:
+    except ConnectionError as e:
         logger.exception(f"Error handling message: {e}")
         return False
 
 
-async def _cleanup_websocket(websocket: WebSocket) -> None:
+async def _handle_websocket_batch(
+    websocket: WebSocket, batch: list[str | None]
+) -> bool:
+    """
+    Handle the messages that arrived since the previous batch, in order.
+
+    Each scene_update carries the whole scene, so only the last one in a batch
+    is handled; the earlier ones would be overwritten before anyone saw them.
+
+    Returns:
+        bool: True to continue processing, False to break the loop
+    """
+    messages = []
+    should_continue = True
+    for data in batch:
+        # None marks the end of the connection
+        message = _parse_websocket_message(data) if data is not None else None
+        if message is None:
+            should_continue = False
+            break
+        messages.append(message)
+
+    scene_updates = [m for m in messages if m.get("type") == "scene_update"]
+    for message in messages:
+        if message.get("type") == "scene_update" and message is not scene_updates[-1]:
+            continue
+        if not await _handle_websocket_message(websocket, message):
+            return False
+    return should_continue
+
+
+async def _receive_messages(
+    websocket: WebSocket, inbox: asyncio.Queue[str | None]
+) -> None:
+    """Read a client's messages into its inbox, ending with None on disconnect."""
+    try:
+        while True:
+            await inbox.put(await websocket.receive_text())
+    except WebSocketDisconnect:
+        # Client disconnected, end the inbox normally
+        pass
+    except (ConnectionError, RuntimeError) as e:
+        logger.debug(f"WebSocket disconnected: {e}")
+    except Exception as e:
+        # Nothing awaits this task, so anything else (e.g. a binary frame, which
+        # receive_text can't read) would otherwise go unreported
+        logger.exception(f"Error receiving message: {e}")
+    # Not reached when the task is cancelled, which only happens once the
+    # handler loop has stopped reading the inbox
+    await inbox.put(None)
+
+
+async def _cleanup_websocket(
+    websocket: WebSocket,
+    writer: asyncio.Task[None] | None,
+    reader: asyncio.Task[None] | None,
+) -> None:
     """Clean up websocket connection."""
-    async with clients_lock:
-        clients.discard(websocket)
+    clients.pop(websocket, None)
+    for task in (writer, reader):
+        if task:
+            task.cancel()
     try:
         if websocket.client_state != WebSocketState.DISCONNECTED:
             await websocket.close()
@@ -206,18 +414,22 @@ async def _cleanup_websocket(websocket: WebSocket) -> None:
         pass
 
 
-async def _setup_websocket_connection(websocket: WebSocket) -> None:
-    """Set up a new websocket connection."""
+async def _setup_websocket_connection(websocket: WebSocket) -> asyncio.Task[None]:
+    """Set up a new websocket connection, returning its writer task."""
     # Accept the WebSocket connection
     await websocket.accept()
-    async with clients_lock:
-        clients.add(websocket)
 
-    # Send initial connection success message
-    await websocket.send_json({"type": "connection_status", "status": "connected"})
+    # The connection status and current scene are queued before the client is
+    # registered, so they go out ahead of any broadcast
+    outbox = _ClientOutbox(asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE))
+    outbox.queue.put_nowait(_CONNECTED_MESSAGE)
+    initial_scene = _initial_scene_message()
+    if initial_scene:
+        outbox.scene = initial_scene
+        outbox.queue.put_nowait(_QUEUED_SCENE)
 
-    # Send current scene if it exists
-    await _send_initial_scene(websocket)
+    clients[websocket] = outbox
+    return asyncio.create_task(_client_writer(websocket, outbox))
 
 
 @router.websocket("/ws")
@@ -225,21 +437,21 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
     """
     WebSocket endpoint for the FastAPI app.
     """
+    writer = reader = None
     try:
-        await _setup_websocket_connection(websocket)
+        writer = await _setup_websocket_connection(websocket)
+
+        # Messages are read by a separate task so that everything that piled
+        # up while the previous batch was handled can be taken at once
+        inbox: asyncio.Queue[str | None] = asyncio.Queue(maxsize=CLIENT_INBOX_SIZE)
+        reader = asyncio.create_task(_receive_messages(websocket, inbox))
 
         # Main message processing loop
         while True:
-            try:
-                data = await websocket.receive_text()
-                should_continue = await _handle_websocket_message(websocket, data)
-                if not should_continue:
-                    break
-            except WebSocketDisconnect:
-                # Client disconnected, exit the loop normally
-                break
-            except (json.JSONDecodeError, ConnectionError) as e:
-                logger.exception(f"Error in message loop: {e}")
+            batch = [await inbox.get()]
+            while not inbox.empty():
+                batch.append(inbox.get_nowait())
+            if not await _handle_websocket_batch(websocket, batch):
                 break
 
     except (WebSocketDisconnect, ConnectionError, RuntimeError) as e:
@@ -247,4 +459,4 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
             f"WebSocket disconnected: {e}"
         )  # Changed to debug level for normal disconnects
     finally:
-        await _cleanup_websocket(websocket)
+        await _cleanup_websocket(websocket, writer, reader)
@@ -3,18 +3,53 @@ This module provides services related to monster management in the game.
 """
 
 import hashlib
-import json
+import os
 import threading
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from pydantic import TypeAdapter
 
 from ..core.constants import MONSTERS_DIR
 from ..models.monster import Monster
 
+# Parses and validates a whole monster file in one pydantic-core call without an
+# intermediate list of dicts
+_MONSTER_LIST_ADAPTER = TypeAdapter(list[Monster])
+
+# Algorithm of the content hash that is compared with VERIFY_FILE_HASH
+_HASH_ALGORITHM = "sha256"
+
+
+class _MonsterCache(NamedTuple):
+    """Monsters loaded from the monster file, replaced as a whole on reload."""
+
+    # (st_mtime_ns, st_size) of the file the monsters were loaded from
+    file_key: tuple[int, int]
+    # Content hash of that file, only set with VERIFY_FILE_HASH
+    file_hash: str
+    monsters: list[Monster]
+    # Position of each monster in monsters by name
+    index: dict[str, int]
+
 
 class MonsterService:
     _instance = None
     _lock = threading.Lock()
+    # Serializes reloading and writing the monster file. Requests that hit the
+    # cache don't take it.
+    _file_lock = threading.RLock()
 
     MONSTER_FILE_PATH: str = MONSTERS_DIR + "/monsters.json"
+    # Also compare a hash of the file content before trusting the cache, for
+    # setups where the file can change without its mtime or size changing
+    VERIFY_FILE_HASH: bool = False
+
+    # When loading the file content (monsters) from the disk a cache mechanism is used to avoid unmarshalling the JSON
+    # content every time a monster is requested. The cache is invalidated when the file changes, which is detected
+    # from its modification time and size, so a request that hits the cache costs a single stat call and no reads.
+    # The cache is never modified in place, only replaced, so it can be read without holding a lock.
+    monster_cache: _MonsterCache | None
 
     def __new__(cls):
         """Singleton pattern to ensure only one instance of MonsterService exists."""
@@ -23,84 +58,152 @@ class MonsterService:
                 # Another thread could have created the instance before we acquired the lock. So check that the
                 # instance is still nonexistent.
                 if not cls._instance:
-                    cls._instance = super().__new__(cls)
+                    # The instance is fully set up before it is published, as other threads check for it without
+                    # the lock
+                    instance = super().__new__(cls)
+                    instance.monster_cache = None
+                    cls._instance = instance
         return cls._instance
 
-    def __init__(self):
-        if getattr(self, "_initialized", False):
-            return
-        # When loading the file content (monsters) from the disk a cache mechanism is used to avoid unmarshalling the JSON
-        # content every time a monster is requested. The cache is invalidated when the file changes. Despite the binary
-        # content of a file being read every time when a monster is requested for hash calculation, this is still more
-        # efficient than reading the file content and unmarshalling the JSON every time as JSON unmarshalling is quite
-        # expensive in terms of performance and the majority of the time there are no changes to the file.
-        self.monster_file_hash: str = ""
-        self.monster_cache: list[Monster] | None = None
-        self._initialized = True
-
     def load_monsters(self) -> list[Monster]:
         """Load all monsters."""
-        return self.__load_monsters_from_file()
+        return self.__load_monsters_from_file().monsters
 
     def load_monster(self, monster_name: str) -> Monster | None:
         """Load a monster by name. Returns None if the monster does not exist."""
-        monsters = self.__load_monsters_from_file()
-        for monster in monsters:
-            if monster.name == monster_name:
-                return monster
-        return None
+        cache = self.__load_monsters_from_file()
+        i = cache.index.get(monster_name)
+        return cache.monsters[i] if i is not None else None
 
     def create_monster(self, monster: Monster) -> bool:
         """Create a new monster. Returns True if the monster was created, False if a monster with the same name already exists."""
-        monsters = self.__load_monsters_from_file()
-        if any(m.name == monster.name for m in monsters):
-            return False
-        monsters.append(monster)
-        self.__save_monsters_to_file(monsters)
-        return True
+        with self._file_lock:
+            cache = self.__load_monsters_from_file()
+            if monster.name in cache.index:
+                return False
+            self.__save_monsters_to_file([*cache.monsters, monster])
+            return True
 
     def update_monster(self, monster_name: str, monster: Monster) -> bool:
         """Update an existing monster. Returns True if the monster was updated, False if the monster does not exist."""
-        monsters = self.__load_monsters_from_file()
-        for i, m in enumerate(monsters):
-            if m.name == monster_name:
-                monsters[i] = monster
-                self.__save_monsters_to_file(monsters)
-                return True
-        return False
+        with self._file_lock:
+            cache = self.__load_monsters_from_file()
+            i = cache.index.get(monster_name)
+            if i is None:
+                return False
+            monsters = list(cache.monsters)
+            monsters[i] = monster
+            self.__save_monsters_to_file(monsters)
+            return True
 
     def delete_monster(self, monster_name: str) -> bool:
         """Delete a monster by name. Returns True if a monster was deleted, False otherwise."""
-        monsters = self.__load_monsters_from_file()
-        initial_count = len(monsters)
-        monsters = [monster for monster in monsters if monster.name != monster_name]
-        self.__save_monsters_to_file(monsters)
-        return len(monsters) < initial_count
-
-    def __load_monsters_from_file(self, ignore_cache=False) -> list[Monster]:
-        if not ignore_cache:
-            current_hash = self.__calculate_file_hash(self.MONSTER_FILE_PATH)
-            if (
-                self.monster_file_hash == current_hash
-                and self.monster_cache is not None
-            ):
-                return self.monster_cache
-            self.monster_file_hash = current_hash
-
-        with open(file=self.MONSTER_FILE_PATH, encoding="utf-8") as file:
-            data = json.load(file)
-
-        self.monster_cache = [Monster(**monster_dict) for monster_dict in data]
-        return self.monster_cache
+        with self._file_lock:
+            cache = self.__load_monsters_from_file()
+            if monster_name not in cache.index:
+                return False
+            self.__save_monsters_to_file(
+                [monster for monster in cache.monsters if monster.name != monster_name]
+            )
+            return True
+
+    def __load_monsters_from_file(self, ignore_cache=False) -> _MonsterCache:
+        # Checked without the lock first, so requests that hit the cache never wait
+        cache = self.__current_cache(ignore_cache)
+        if cache is not None:
+            return cache
+        with self._file_lock:
+            # Another thread may have reloaded the file while this one waited
+            cache = self.__current_cache(ignore_cache)
+            if cache is None:
+                cache = self.__read_monsters(ignore_cache)
+                self.monster_cache = cache
+            return cache
+
+    def __current_cache(self, ignore_cache: bool) -> _MonsterCache | None:
+        cache = None if ignore_cache else self.monster_cache
+        if cache is None or self.VERIFY_FILE_HASH:
+            return None
+        stat = os.stat(self.MONSTER_FILE_PATH)
+        return cache if cache.file_key == (stat.st_mtime_ns, stat.st_size) else None
+
+    def __read_monsters(self, ignore_cache: bool) -> _MonsterCache:
+        stat = os.stat(self.MONSTER_FILE_PATH)
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        # The file is read once; the same bytes are hashed and, on a cache miss,
+        # parsed
+        with open(file=self.MONSTER_FILE_PATH, mode="rb") as file:
+            content = file.read()
+
+        file_hash = ""
+        if self.VERIFY_FILE_HASH:
+            file_hash = self.__calculate_hash(content)
+            cached = None if ignore_cache else self.monster_cache
+            if cached is not None and cached.file_hash == file_hash:
+                return cached._replace(file_key=file_key)
+
+        monsters = _MONSTER_LIST_ADAPTER.validate_json(content)
+        return _MonsterCache(file_key, file_hash, monsters, self.__index(monsters))
+
+    def __index(self, monsters: list[Monster]) -> dict[str, int]:
+        index: dict[str, int] = {}
+        for i, monster in enumerate(monsters):
+            # Like a linear search, a duplicate name resolves to the first match
+            index.setdefault(monster.name, i)
+        return index
 
     def __save_monsters_to_file(self, monsters: list[Monster]) -> None:
-        self.monster_file_hash = ""
-        with open(file=self.MONSTER_FILE_PATH, mode="w", encoding="utf-8") as file:
-            json.dump([monster.model_dump() for monster in monsters], file, indent=2)
-
-    def __calculate_file_hash(self, file_path: str, algorithm="sha256") -> str:
-        hash_function = hashlib.new(algorithm)
-        with open(file_path, "rb") as file:
-            while chunk := file.read(8192):
-                hash_function.update(chunk)
-        return hash_function.hexdigest()
+        with self._file_lock:
+            # Written next to the file and renamed over it, so a reader never
+            # sees a partially written file. The data is flushed to disk before
+            # the rename, so a crash leaves either the old or the new file.
+            tmp_path = self.MONSTER_FILE_PATH + ".tmp"
+            hash_function = (
+                hashlib.new(_HASH_ALGORITHM) if self.VERIFY_FILE_HASH else None
+            )
+            with open(file=tmp_path, mode="wb") as file:
+                for chunk in self.__iter_monsters_json(monsters):
+                    file.write(chunk)
+                    if hash_function is not None:
+                        hash_function.update(chunk)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.MONSTER_FILE_PATH)
+            self.__fsync_dir(os.path.dirname(self.MONSTER_FILE_PATH))
+
+            # The saved list is what the file now contains, so it becomes the
+            # cache directly instead of being parsed back on the next request
+            stat = os.stat(self.MONSTER_FILE_PATH)
+            self.monster_cache = _MonsterCache(
+                (stat.st_mtime_ns, stat.st_size),
+                hash_function.hexdigest() if hash_function is not None else "",
+                monsters,
+                self.__index(monsters),
+            )
+
+    def __iter_monsters_json(self, monsters: list[Monster]) -> Iterator[bytes]:
+        # Serializes one monster at a time, so only a single monster's JSON is
+        # held in memory while saving. The output is the same as dumping the
+        # whole list with indent=2: each item is indented one more level, which
+        # is safe to do on the raw bytes as JSON strings can't contain newlines.
+        if not monsters:
+            yield b"[]"
+            return
+        for i, monster in enumerate(monsters):
+            item = monster.model_dump_json(indent=2).encode()
+            yield (b"[\n  " if i == 0 else b",\n  ") + item.replace(b"\n", b"\n  ")
+        yield b"\n]"
+
+    def __fsync_dir(self, path: str) -> None:
+        # Makes the rename itself durable on POSIX systems. Windows has no way
+        # to open a directory for this, so it is skipped there.
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(path or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __calculate_hash(self, content: bytes) -> str:
+        return hashlib.new(_HASH_ALGORITHM, content).hexdigest()
@@ -5,6 +5,7 @@ Creates tables and default users.
 
 import os
 import sys
+from typing import cast
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -13,6 +14,7 @@ from loguru import logger
 
 from app.core.auth import get_password_hash
 from app.core.database import SessionLocal, init_db
+from app.models import campaign_tavern as _campaign_tavern_models  # noqa: F401
 from app.models.campaign import Campaign
 from app.models.user import User, UserRole
 
@@ -21,32 +23,40 @@ def create_default_users() -> None:
     """Create default admin and viewer users."""
     db = SessionLocal()
     try:
-        # Check if admin user already exists
-        admin_user = db.query(User).filter(User.username == "admin").first()
-        if not admin_user:
-            admin_user = User(
-                username="admin",
-                email="admin@spelltable.com",
-                hashed_password=get_password_hash("admin123"),
-                role=UserRole.ADMIN,
-                is_active=True,
+        # Check which default users already exist in a single query
+        existing_usernames = {
+            username
+            for (username,) in db.query(User.username).filter(
+                User.username.in_(["admin", "viewer"])
+            )
+        }
+        new_users = []
+
+        if "admin" not in existing_usernames:
+            new_users.append(
+                User(
+                    username="admin",
+                    email="admin@spelltable.com",
+                    hashed_password=get_password_hash("admin123"),
+                    role=UserRole.ADMIN,
+                    is_active=True,
+                )
             )
-            db.add(admin_user)
             logger.info("Created default admin user: admin/admin123")
 
-        # Check if viewer user already exists
-        viewer_user = db.query(User).filter(User.username == "viewer").first()
-        if not viewer_user:
-            viewer_user = User(
-                username="viewer",
-                email="viewer@spelltable.com",
-                hashed_password=get_password_hash("viewer123"),
-                role=UserRole.VIEWER,
-                is_active=True,
+        if "viewer" not in existing_usernames:
+            new_users.append(
+                User(
+                    username="viewer",
+                    email="viewer@spelltable.com",
+                    hashed_password=get_password_hash("viewer123"),
+                    role=UserRole.VIEWER,
+                    is_active=True,
+                )
             )
-            db.add(viewer_user)
             logger.info("Created default viewer user: viewer/viewer123")
 
+        db.add_all(new_users)
         db.commit()
         logger.info("Default users created successfully")
 
@@ -62,18 +72,27 @@ def create_sample_campaigns() -> None:
     db = SessionLocal()
     try:
         # Get the admin and viewer users
-        admin_user = db.query(User).filter(User.username == "admin").first()
-        viewer_user = db.query(User).filter(User.username == "viewer").first()
+        users = {
+            cast(str, user.username): user
+            for user in db.query(User).filter(User.username.in_(["admin", "viewer"]))
+        }
+        admin_user = users.get("admin")
+        viewer_user = users.get("viewer")
 
         if not admin_user or not viewer_user:
             logger.warning("Admin or viewer user not found, skipping campaign creation")
             return
 
-        # Check if sample campaign already exists
-        sample_campaign = (
-            db.query(Campaign).filter(Campaign.name == "Sample Campaign").first()
-        )
-        if not sample_campaign:
+        # Check which sample campaigns already exist in a single query
+        existing_names = {
+            name
+            for (name,) in db.query(Campaign.name).filter(
+                Campaign.name.in_(["Sample Campaign", "Adventure Campaign"])
+            )
+        }
+        new_campaigns = []
+
+        if "Sample Campaign" not in existing_names:
             sample_campaign = Campaign(
                 name="Sample Campaign",
                 description="A sample campaign for testing the diary functionality",
@@ -82,14 +101,11 @@ def create_sample_campaigns() -> None:
             )
             # Assign both admin and viewer to the campaign
             sample_campaign.users = [admin_user, viewer_user]
-            db.add(sample_campaign)
+            new_campaigns.append(sample_campaign)
             logger.info("Created sample campaign: 'Sample Campaign'")
 
         # Create another sample campaign
-        second_campaign = (
-            db.query(Campaign).filter(Campaign.name == "Adventure Campaign").first()
-        )
-        if not second_campaign:
+        if "Adventure Campaign" not in existing_names:
             second_campaign = Campaign(
                 name="Adventure Campaign",
                 description="An exciting adventure campaign for multiple players",
@@ -98,9 +114,10 @@ def create_sample_campaigns() -> None:
             )
             # Assign both admin and viewer to the second campaign
             second_campaign.users = [admin_user, viewer_user]
-            db.add(second_campaign)
+            new_campaigns.append(second_campaign)
             logger.info("Created sample campaign: 'Adventure Campaign'")
 
+        db.add_all(new_campaigns)
         db.commit()
         logger.info("Sample campaigns created successfully")
 
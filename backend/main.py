@@ -2,8 +2,12 @@
 This module is the entry point for the FastAPI app.
 """
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import orjson
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from loguru import logger
 
 from app.core.config import create_app
@@ -25,6 +29,17 @@ from app.routes import (
 )
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """
+    Run startup tasks when the server starts rather than when main is imported.
+    """
+    # Initialize database
+    logger.info("Initializing database")
+    init_db()
+    yield
+
+
 def get_application() -> FastAPI:
     """
     Create and configure the FastAPI application.
@@ -34,11 +49,7 @@ def get_application() -> FastAPI:
     setup_logger()
 
     logger.info("Initializing FastAPI application")
-    local_app = create_app()
-
-    # Initialize database
-    logger.info("Initializing database")
-    init_db()
+    local_app = create_app(lifespan=lifespan)
 
     # Include routers
     logger.info("Registering application routes")
@@ -60,23 +71,28 @@ def get_application() -> FastAPI:
 # Create the application instance
 app = get_application()
 
+# Bodies of the fixed responses below, encoded once. A new Response is still
+# built per request, since middleware may modify a response's headers in place.
+_ROOT_BODY = orjson.dumps({"message": "Welcome to SpellTable API"})
+_HEALTH_BODY = orjson.dumps({"status": "ok"})
+
 
 @app.get("/")
-async def root() -> dict[str, str]:
+async def root() -> Response:
     """
     Root endpoint for the FastAPI app.
     """
     logger.debug("Root endpoint accessed")
-    return {"message": "Welcome to SpellTable API"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
-async def health_check() -> dict[str, str]:
+async def health_check() -> Response:
     """
     Health check endpoint for monitoring the application status.
     """
     logger.debug("Health check endpoint accessed")
-    return {"status": "ok"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":